@@ -2,11 +2,12 @@
 import os
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from app.routers import natal
+from app.routers import natal, sky
 
 app = FastAPI(title="Astro API")
 
 app.include_router(natal.router)
+app.include_router(sky.router)
 
 API_KEY = os.getenv("API_KEY")  # None -> отключаем проверку локально
 
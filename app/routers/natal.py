@@ -1,18 +1,49 @@
 # app/routers/natal.py
 from __future__ import annotations
 from typing import Optional, List, Any
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Header
 from datetime import datetime
+from functools import partial
 from zoneinfo import ZoneInfo
 import swisseph as swe
 
 from app.services.astro import calc_chart
 from app.services.astro.parts import calc_part_of_fortune
 from app.services.astro.san import calc_prenatal_lunations
+from app.services.astro.progressions import calc_progressions
+from app.services.astro.astrocartography import calc_astrocartography
+from app.services.profiling import run_profiled
+from app.services.serialization import render, flatten
 
 router = APIRouter(prefix="/natal", tags=["natal"])
 
 
+# Раскладка ответов в одну Arrow-таблицу: (строки или колонки, остальное -> метаданные)
+def _chart_table(res: dict):
+    rows = [{"name": name, **body} for name, body in res["bodies"].items()]
+    return rows, {k: v for k, v in res.items() if k != "bodies"}
+
+
+def _progressions_table(res: dict, which: str = "timeline"):
+    # В Arrow IPC одна схема на ответ: таймлайн или события — по arrowTable
+    if which == "events":
+        rows = res["events"]
+    else:
+        rows = [flatten(point) for point in res["timeline"]]
+    return rows, {k: v for k, v in res.items() if k not in ("timeline", "events")}
+
+
+def _astrocartography_table(res: dict):
+    cols = {"lon": res["lon"]}
+    meta = {k: v for k, v in res.items() if k not in ("lon", "bodies")}
+    meta["bodies"] = {}
+    for name, body in res["bodies"].items():
+        cols[f"{name}.ASC"] = body["ASC"]
+        cols[f"{name}.DC"] = body["DC"]
+        meta["bodies"][name] = {k: v for k, v in body.items() if k not in ("ASC", "DC")}
+    return cols, meta
+
+
 def _to_jd_utc(date: str, time: str, tz: str) -> float:
     try:
         dt_local = datetime.fromisoformat(f"{date}T{time}")
@@ -57,6 +88,32 @@ def natal_chart(
     detail: bool = Query(True),
     fortuneUseSect: bool = Query(True),
     fortuneForceDiurnal: Optional[bool] = Query(None),
+    precision: Optional[int] = Query(None, ge=0, le=12, description="Округлить float до N знаков"),
+    profile: bool = Query(False, description="Профиль запроса (нужен заголовок X-Admin-Key)"),
+    profileFormat: str = Query("json", description="json | pstats"),
+    x_admin_key: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    args = (date, time, lat, lon, tz, houseSystem, nodes, stars, detail, fortuneUseSect, fortuneForceDiurnal)
+    if profile:
+        result = run_profiled(_natal_chart, *args, admin_key=x_admin_key, fmt=profileFormat)
+    else:
+        result = _natal_chart(*args)
+    return render(result, accept=accept, precision=precision, table=_chart_table)
+
+
+def _natal_chart(
+    date: str,
+    time: str,
+    lat: float,
+    lon: float,
+    tz: str,
+    houseSystem: str,
+    nodes: str,
+    stars: Optional[List[str]],
+    detail: bool,
+    fortuneUseSect: bool,
+    fortuneForceDiurnal: Optional[bool],
 ):
     try:
         star_list = _normalize_stars(stars)
@@ -99,4 +156,69 @@ def natal_chart(
             "PartOfFortune": pof,
             **san
         }
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/progressions")
+def natal_progressions(
+    date: str = Query(..., example="1971-06-22"),
+    time: str = Query(..., example="02:30:00"),
+    lat: float = Query(..., example=59.4167),
+    lon: float = Query(..., example=24.75),
+    tz: str = Query("UTC", example="Europe/Tallinn"),
+    years: int = Query(90, ge=1, le=120),
+    step: str = Query("year", description="year | month"),
+    aspects: bool = Query(True, description="Искать точные аспекты прогрессий к натальным точкам"),
+    arrowTable: str = Query("timeline", description="Для Arrow-ответа: timeline | events"),
+    precision: Optional[int] = Query(None, ge=0, le=12, description="Округлить float до N знаков"),
+    profile: bool = Query(False, description="Профиль запроса (нужен заголовок X-Admin-Key)"),
+    profileFormat: str = Query("json", description="json | pstats"),
+    x_admin_key: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    if arrowTable not in ("timeline", "events"):
+        raise HTTPException(400, detail=f"Unknown arrowTable: {arrowTable}. Use timeline | events")
+    jd_ut = _to_jd_utc(date, time, tz)
+    args = (jd_ut, lat, lon, years, step, aspects)
+    if profile:
+        result = run_profiled(_progressions, *args, admin_key=x_admin_key, fmt=profileFormat)
+    else:
+        result = _progressions(*args)
+    return render(result, accept=accept, precision=precision, columnar=("timeline", "events"),
+                  table=partial(_progressions_table, which=arrowTable))
+
+
+def _progressions(jd_ut: float, lat: float, lon: float, years: int, step: str, aspects: bool):
+    try:
+        return calc_progressions(jd_ut, lat, lon, years=years, step=step, aspects=aspects)
+    except Exception as e:
+        raise HTTPException(400, detail=f"Progressions error: {e}")
+
+
+@router.get("/astrocartography")
+def natal_astrocartography(
+    date: str = Query(..., example="1971-06-22"),
+    time: str = Query(..., example="02:30:00"),
+    tz: str = Query("UTC", example="Europe/Tallinn"),
+    lonStep: float = Query(0.5, gt=0, le=10, description="Шаг сетки долгот, градусы"),
+    maxLat: float = Query(80.0, gt=0, lt=90),
+    precision: Optional[int] = Query(None, ge=0, le=12, description="Округлить float до N знаков"),
+    profile: bool = Query(False, description="Профиль запроса (нужен заголовок X-Admin-Key)"),
+    profileFormat: str = Query("json", description="json | pstats"),
+    x_admin_key: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    jd_ut = _to_jd_utc(date, time, tz)
+    args = (jd_ut, lonStep, maxLat)
+    if profile:
+        result = run_profiled(_astrocartography, *args, admin_key=x_admin_key, fmt=profileFormat)
+    else:
+        result = _astrocartography(*args)
+    return render(result, accept=accept, precision=precision, table=_astrocartography_table)
+
+
+def _astrocartography(jd_ut: float, lonStep: float, maxLat: float):
+    try:
+        return calc_astrocartography(jd_ut, lon_step=lonStep, max_lat=maxLat)
+    except Exception as e:
+        raise HTTPException(400, detail=f"Astrocartography error: {e}")
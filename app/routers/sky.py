@@ -0,0 +1,68 @@
+# app/routers/sky.py
+from __future__ import annotations
+from typing import Optional
+import asyncio
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.astro.houses import HOUSE_SYSTEMS
+from app.services.sky_stream import broadcaster, location_key
+
+router = APIRouter(prefix="/sky", tags=["sky"])
+
+KEEPALIVE_SEC = 15.0
+
+
+@router.get("/stream")
+async def sky_stream(
+    request: Request,
+    lat: Optional[float] = Query(None, example=59.4167),
+    lon: Optional[float] = Query(None, example=24.75),
+    houseSystem: str = Query("Placidus", description="Placidus | Equal | WholeSign | Alcabitius | Porphyry"),
+):
+    """
+    Server-Sent Events: текущее небо (планеты, Луна, узел) раз в тик.
+    Расчёт общий для всех подписчиков; дома/углы — только если передан lat+lon.
+    """
+    if (lat is None) != (lon is None):
+        raise HTTPException(400, detail="lat и lon передаются вместе")
+    location = None
+    if lat is not None:
+        if houseSystem not in HOUSE_SYSTEMS:
+            raise HTTPException(400, detail=f"Unknown house system: {houseSystem}")
+        location = location_key(lat, lon, houseSystem)
+
+    sub = broadcaster.subscribe(location)
+
+    async def wait_disconnect():
+        # Ждём http.disconnect от сервера: запись в закрытый сокет ошибки не даёт,
+        # а кадры приходят чаще keepalive — без этого мёртвый подписчик жил бы вечно
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+
+    async def events():
+        disconnected = asyncio.ensure_future(wait_disconnect())
+        try:
+            yield f"retry: {int(broadcaster.tick_sec * 1000)}\n\n"
+            while True:
+                frame_task = asyncio.ensure_future(sub.queue.get())
+                done, _ = await asyncio.wait(
+                    {frame_task, disconnected}, timeout=KEEPALIVE_SEC, return_when=asyncio.FIRST_COMPLETED
+                )
+                if disconnected in done:
+                    frame_task.cancel()
+                    break
+                if frame_task not in done:
+                    frame_task.cancel()
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: sky\ndata: {frame_task.result()}\n\n"
+        finally:
+            disconnected.cancel()
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,93 @@
+# app/services/astro/astrocartography.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+import numpy as np
+import swisseph as swe
+
+from .planets import calc_planets
+from .moon import calc_moon
+
+# Знаков после запятой в координатах линий — хватает для карты и сильно сокращает JSON
+DECIMALS = 3
+
+
+def _wrap180(x):
+    """Долгота в диапазон [-180,180)."""
+    return (np.asarray(x) + 180.0) % 360.0 - 180.0
+
+def _ecl_to_equ(lon_deg: np.ndarray, lat_deg: np.ndarray, eps_deg: float):
+    """Эклиптические (λ, β) -> экваториальные (α, δ), градусы, векторно."""
+    lam, beta, eps = np.radians(lon_deg), np.radians(lat_deg), np.radians(eps_deg)
+    sin_dec = np.sin(beta) * np.cos(eps) + np.cos(beta) * np.sin(eps) * np.sin(lam)
+    ra = np.arctan2(np.sin(lam) * np.cos(eps) - np.tan(beta) * np.sin(eps), np.cos(lam))
+    return np.degrees(ra) % 360.0, np.degrees(np.arcsin(np.clip(sin_dec, -1.0, 1.0)))
+
+def _to_list(a: np.ndarray) -> List[Optional[float]]:
+    # NaN -> null (в JSON NaN недопустим)
+    return [None if v != v else v for v in np.round(a, DECIMALS).tolist()]
+
+
+def calc_astrocartography(jd_ut: float, lon_step: float = 0.5, max_lat: float = 80.0) -> Dict[str, Any]:
+    """
+    Линии астрокартографии (ASC/MC/DC/IC) для Sun..Saturn и Луны.
+    Позиции тел считаются один раз, звёздное время — один swe.sidtime на карту;
+    дальше всё в замкнутой форме по сетке географических долгот:
+      MC/IC — меридианы, где LST = α (IC: α + 180°);
+      ASC/DC — широта, где тело на горизонте: tg φ = −cos H / tg δ, H = LST − α;
+               восход (ASC) при sin H < 0, заход (DC) при sin H > 0.
+    Точки кривых за пределами |φ| ≤ max_lat — null.
+    """
+    if not 0.0 < lon_step <= 10.0:
+        raise ValueError("lon_step must be in (0, 10]")
+    if not 0.0 < max_lat < 90.0:
+        raise ValueError("max_lat must be in (0, 90)")
+
+    bodies = calc_planets(jd_ut, detail=True)
+    bodies["Moon"] = calc_moon(jd_ut, detail=True)
+    names = list(bodies.keys())
+
+    nut, _ = swe.calc_ut(jd_ut, swe.ECL_NUT)
+    eps = float(nut[0])  # истинный наклон эклиптики
+    gst_deg = swe.sidtime(jd_ut) * 15.0
+
+    ra, dec = _ecl_to_equ(
+        np.array([bodies[n]["lon"] for n in names]),
+        np.array([bodies[n]["lat"] for n in names]),
+        eps,
+    )
+
+    grid = np.arange(-180.0, 180.0 + lon_step / 2, lon_step)
+    grid = grid[grid <= 180.0]
+
+    # Часовой угол каждого тела на каждой долготе сетки: (тела × долготы)
+    hour_angle = np.radians(gst_deg + grid[None, :] - ra[:, None])
+    tan_dec = np.tan(np.radians(dec))[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lat_horizon = np.degrees(np.arctan(-np.cos(hour_angle) / tan_dec))
+    lat_horizon[np.abs(lat_horizon) > max_lat] = np.nan
+
+    rising = np.sin(hour_angle) < 0.0
+    asc = np.where(rising, lat_horizon, np.nan)
+    dc = np.where(~rising, lat_horizon, np.nan)
+
+    mc = _wrap180(ra - gst_deg)
+    ic = _wrap180(mc + 180.0)
+
+    lines: Dict[str, Any] = {}
+    for i, name in enumerate(names):
+        lines[name] = {
+            "ra": round(float(ra[i]), 6),
+            "dec": round(float(dec[i]), 6),
+            "MC": round(float(mc[i]), DECIMALS),
+            "IC": round(float(ic[i]), DECIMALS),
+            "ASC": _to_list(asc[i]),
+            "DC": _to_list(dc[i]),
+        }
+
+    return {
+        "gst_deg": gst_deg,
+        "obliquity": eps,
+        "max_lat": max_lat,
+        "lon": _to_list(grid),
+        "bodies": lines,
+    }
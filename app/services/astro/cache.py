@@ -0,0 +1,117 @@
+# app/services/astro/cache.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import copy
+import os
+import threading
+
+# Размеры кэшей (кол-во записей); 0 -> кэш отключён
+SKY_CACHE_SIZE = int(os.getenv("ASTRO_SKY_CACHE_SIZE", "4096"))
+LOCAL_CACHE_SIZE = int(os.getenv("ASTRO_LOCAL_CACHE_SIZE", "1024"))
+
+# Квант времени для ключа, секунды (1 -> секунда, 60 -> минута).
+# При кванте > 1 с моменты внутри одного кванта получают один и тот же результат.
+JD_QUANTUM_SEC = int(os.getenv("ASTRO_CACHE_QUANTUM_SEC", "1"))
+
+
+class LRUCache:
+    """Простой потокобезопасный LRU-кэш с ограниченным числом записей."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(0, int(maxsize))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Зависит только от момента UT: планеты, Луна, узлы, звёзды, SAN
+SKY_CACHE = LRUCache(SKY_CACHE_SIZE)
+# Зависит от момента и места: дома/углы, секта (день/ночь)
+LOCAL_CACHE = LRUCache(LOCAL_CACHE_SIZE)
+
+_MISSING = object()
+
+# Если задано — cached() не читает и не пишет кэш, а считает подряд (профилирование).
+# Значение — счётчик обойдённых обращений по типу записи (первый элемент ключа).
+_bypass: ContextVar[Optional[Dict[str, int]]] = ContextVar("astro_cache_bypass", default=None)
+
+
+@contextmanager
+def bypass_cache() -> Iterator[Dict[str, int]]:
+    """Внутри блока кэши не используются; отдаёт счётчик обойдённых обращений."""
+    counts: Dict[str, int] = {}
+    token = _bypass.set(counts)
+    try:
+        yield counts
+    finally:
+        _bypass.reset(token)
+
+
+def jd_key(jd_ut: float) -> int:
+    """JD -> целое число квантов JD_QUANTUM_SEC (ключ кэша)."""
+    return int(round(jd_ut * 86400.0 / max(1, JD_QUANTUM_SEC)))
+
+
+def cached(cache: LRUCache, key: Hashable, compute: Callable[[], Any]) -> Any:
+    """
+    Вернёт значение из кэша или посчитает compute() и положит в кэш.
+    Отдаём глубокую копию, чтобы вызывающий код не испортил закэшированное.
+    """
+    bypassed = _bypass.get()
+    if bypassed is not None:
+        label = str(key[0]) if isinstance(key, tuple) and key else "?"
+        bypassed[label] = bypassed.get(label, 0) + 1
+        return compute()
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.put(key, value)
+    return copy.deepcopy(value)
+
+
+def cache_info() -> Dict[str, Dict[str, int]]:
+    return {"sky": SKY_CACHE.info(), "local": LOCAL_CACHE.info()}
+
+
+def clear_caches() -> None:
+    SKY_CACHE.clear()
+    LOCAL_CACHE.clear()
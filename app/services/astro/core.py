@@ -10,6 +10,7 @@ from .moon import calc_moon
 from .nodes import calc_nodes
 from .houses import calc_houses
 from .stars import calc_stars
+from .cache import SKY_CACHE, LOCAL_CACHE, jd_key, cached
 
 def _to_jd_utc(date: str, time: str, tz: str) -> float:
     try:
@@ -33,6 +34,13 @@ def _parse_stars_arg(stars: Optional[Union[str, List[str]]]) -> List[str]:
         return [s.strip() for s in stars.split(",") if s.strip()]
     raise ValueError("stars must be a comma-separated string or list of names")
 
+def _calc_bodies(jd_ut: float, detail: bool, node_kind: str) -> Dict[str, Any]:
+    bodies: Dict[str, Any] = {}
+    bodies.update(calc_planets(jd_ut, detail=detail))
+    bodies["Moon"] = calc_moon(jd_ut, detail=detail)
+    bodies["LunarNode"] = calc_nodes(jd_ut, node_kind)
+    return bodies
+
 def calc_chart(
     date: str,
     time: str,
@@ -45,20 +53,30 @@ def calc_chart(
     detail: bool = True,
 ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float], str, Dict[str, Any]]:
     jd_ut = _to_jd_utc(date, time, tz)
+    key = jd_key(jd_ut)
+    node_kind = nodes or "true"
 
-    bodies: Dict[str, Any] = {}
-    bodies.update(calc_planets(jd_ut, detail=detail))
-    bodies["Moon"] = calc_moon(jd_ut, detail=detail)
-    bodies["LunarNode"] = calc_nodes(jd_ut, nodes or "true")
+    # Слой 1: зависит только от момента UT
+    bodies: Dict[str, Any] = cached(
+        SKY_CACHE, ("bodies", key, bool(detail), node_kind),
+        lambda: _calc_bodies(jd_ut, detail, node_kind),
+    )
 
-    houses, angles = calc_houses(jd_ut, lat, lon, houseSystem)
+    # Слой 2: зависит от момента и места
+    houses, angles = cached(
+        LOCAL_CACHE, ("houses", key, float(lat), float(lon), houseSystem),
+        lambda: calc_houses(jd_ut, lat, lon, houseSystem),
+    )
 
     extras: Dict[str, Any] = {}
     star_list = _parse_stars_arg(stars)
     if star_list:
         try:
-            extras["stars"] = calc_stars(jd_ut, star_list)
+            extras["stars"] = cached(
+                SKY_CACHE, ("stars", key, tuple(star_list)),
+                lambda: calc_stars(jd_ut, star_list),
+            )
         except Exception as e:
             extras["stars"] = {"error": f"stars calc failed: {e}"}
 
-    return bodies, houses, angles, "Swiss Ephemeris", extras
\ No newline at end of file
+    return bodies, houses, angles, "Swiss Ephemeris", extras
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Optional, Dict, Any
 import swisseph as swe
 from .daynight import is_diurnal
+from .cache import LOCAL_CACHE, jd_key, cached
 
 def _norm360(x: float) -> float:
     x %= 360.0
@@ -27,7 +28,13 @@ def calc_part_of_fortune(
     force_diurnal=None — авто (по высоте Солнца). True/False — форс.
     """
     if use_sect:
-        diurnal = is_diurnal(jd_ut, lat_deg, lon_deg) if force_diurnal is None else bool(force_diurnal)
+        if force_diurnal is None:
+            diurnal = cached(
+                LOCAL_CACHE, ("diurnal", jd_key(jd_ut), float(lat_deg), float(lon_deg)),
+                lambda: is_diurnal(jd_ut, lat_deg, lon_deg),
+            )
+        else:
+            diurnal = bool(force_diurnal)
         if diurnal:
             lon = asc_lon_deg + moon_lon_deg - sun_lon_deg
         else:
@@ -0,0 +1,224 @@
+# app/services/astro/progressions.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+import swisseph as swe
+
+from .planets import PLANETS, calc_planets
+from .moon import calc_moon
+
+# Вторичные прогрессии: 1 сутки после рождения = 1 тропический год жизни
+TROPICAL_YEAR = 365.24219
+
+STEPS = {"year": 1.0, "month": 1.0 / 12.0}
+
+SIGNS = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
+]
+
+ASPECTS = [
+    ("conjunction", 0.0),
+    ("sextile", 60.0),
+    ("square", 90.0),
+    ("trine", 120.0),
+    ("opposition", 180.0),
+]
+
+# Прогрессия ARMC по Найбоду: средний суточный ход Солнца по прямому восхождению
+NAIBOD_DEG = 0.98564733
+
+# Предел хода угла (ASC/MC) за год прогрессии. Внутри полярного круга houses_armc
+# перебрасывает ASC на 180° между соседними точками; такой шаг — разрыв, а не движение,
+# и события на нём не ищем (бисекция через разрыв дала бы ложную ингрессию/аспект)
+MAX_ANGLE_DEG_PER_YEAR = 20.0
+_ANGLE_POINTS = ("ASC", "MC")
+
+# Точность уточнения момента события — ~полдня реального времени
+_TOL_PROG_DAYS = 0.5 / TROPICAL_YEAR
+
+_BODY_IDS = dict(PLANETS + [("Moon", swe.MOON)])
+
+
+def _norm360(x: float) -> float:
+    x = x % 360.0
+    return x + 360.0 if x < 0 else x
+
+def _angdiff(a: float, b: float) -> float:
+    # разность a-b в диапазоне (-180,180]
+    return (a - b + 180.0) % 360.0 - 180.0
+
+def _jd_to_date(jd_ut: float) -> str:
+    y, m, d, _ut = swe.revjul(jd_ut, swe.GREG_CAL)
+    return f"{y:04d}-{m:02d}-{d:02d}"
+
+def _body_lon(jd_ut: float, name: str) -> float:
+    xx, _ = swe.calc_ut(jd_ut, _BODY_IDS[name], swe.FLG_SWIEPH)
+    return _norm360(xx[0])
+
+class _Angles:
+    """
+    Прогрессивные ASC/MC: натальный ARMC + возраст × NAIBOD_DEG, углы — через houses_armc.
+    Брать дома на сам прогрессивный момент нельзя: дробная часть суток добавила бы
+    суточное вращение (месяц жизни = 2 часа = 30° по MC).
+    ASC/MC/ARMC от системы домов не зависят; берём Porphyry ('O') — в отличие от
+    Placidus она определена и за полярным кругом.
+    """
+
+    def __init__(self, jd_birth: float, lat: float, lon: float):
+        self.jd_birth = jd_birth
+        self.lat = float(lat)
+        _, ascmc = swe.houses(jd_birth, self.lat, float(lon), b'O')
+        self.armc = float(ascmc[2])
+        nut, _ = swe.calc_ut(jd_birth, swe.ECL_NUT)
+        self.eps = float(nut[0])
+
+    def __call__(self, jd_prog: float):
+        armc = (self.armc + (jd_prog - self.jd_birth) * NAIBOD_DEG) % 360.0
+        _, ascmc = swe.houses_armc(armc, self.lat, self.eps, b'O')
+        return _norm360(ascmc[0]), _norm360(ascmc[1])
+
+def _sample(jd_prog: float, angles: _Angles) -> Dict[str, float]:
+    """Долготы прогрессивных тел и углов на прогрессивный момент."""
+    points = {k: v["lon"] for k, v in calc_planets(jd_prog, detail=False).items()}
+    points["Moon"] = calc_moon(jd_prog, detail=False)["lon"]
+    points["ASC"], points["MC"] = angles(jd_prog)
+    return points
+
+def _point_fn(name: str, angles: _Angles) -> Callable[[float], float]:
+    if name == "ASC":
+        return lambda jd: angles(jd)[0]
+    if name == "MC":
+        return lambda jd: angles(jd)[1]
+    return lambda jd: _body_lon(jd, name)
+
+def _refine(f: Callable[[float], float], a: float, b: float, fa: float) -> float:
+    """Бисекция корня f на [a,b]; f — непрерывная разность углов вблизи нуля."""
+    while b - a > _TOL_PROG_DAYS:
+        m = 0.5 * (a + b)
+        fm = f(m)
+        if fa * fm <= 0:
+            b = m
+        else:
+            a, fa = m, fm
+    return 0.5 * (a + b)
+
+def _crossed(d0: float, d1: float) -> bool:
+    # смена знака без перескока через ±180
+    return (d0 * d1 < 0 and abs(d1 - d0) < 90.0) or (d1 == 0.0 and d0 != 0.0)
+
+
+def calc_progressions(
+    jd_birth: float,
+    lat: float,
+    lon: float,
+    years: int = 90,
+    step: str = "year",
+    aspects: bool = True,
+) -> Dict[str, Any]:
+    """
+    Таймлайн вторичных прогрессий на years лет с шагом step (year | month).
+    Прогрессивные углы — ASC/MC от ARMC, смещённого по Найбоду (~1° в год),
+    для места рождения. SAN и куспиды не считаются. Считаем последовательно: каждое событие
+    (ингрессия в знак, точный аспект к натальной точке) ищется только между
+    соседними точками таймлайна и уточняется бисекцией.
+    """
+    step_years = STEPS.get(step)
+    if step_years is None:
+        raise ValueError(f"Unknown step: {step}. Use year | month")
+
+    angles = _Angles(jd_birth, lat, lon)
+    natal = _sample(jd_birth, angles)
+    names = list(natal.keys())
+    fns = {name: _point_fn(name, angles) for name in names}
+
+    def real_jd(jd_prog: float) -> float:
+        return jd_birth + (jd_prog - jd_birth) * TROPICAL_YEAR
+
+    def event_base(jd_prog: float) -> Dict[str, Any]:
+        return {
+            "date": _jd_to_date(real_jd(jd_prog)),
+            "age": round(jd_prog - jd_birth, 4),
+            "jd_prog": jd_prog,
+        }
+
+    timeline: List[Dict[str, Any]] = []
+    events: List[Dict[str, Any]] = []
+    discontinuities: List[Dict[str, Any]] = []
+    max_angle_step = MAX_ANGLE_DEG_PER_YEAR * step_years
+
+    n_steps = int(round(years / step_years))
+    prev_jd, prev = jd_birth, natal
+    for i in range(n_steps + 1):
+        jd_prog = jd_birth + i * step_years
+        cur = natal if i == 0 else _sample(jd_prog, angles)
+
+        timeline.append({
+            "age": round(i * step_years, 4),
+            "date": _jd_to_date(real_jd(jd_prog)),
+            "jd_prog": jd_prog,
+            "points": {k: {"lon": v, "sign": SIGNS[int(v // 30.0) % 12]} for k, v in cur.items()},
+        })
+
+        if i > 0:
+            for name in names:
+                p0, p1 = prev[name], cur[name]
+                f = fns[name]
+
+                if name in _ANGLE_POINTS and abs(_angdiff(p1, p0)) > max_angle_step:
+                    discontinuities.append({
+                        "point": name,
+                        "age_from": round((prev_jd - jd_birth), 4),
+                        "age_to": round((jd_prog - jd_birth), 4),
+                        "jump_deg": round(_angdiff(p1, p0), 4),
+                    })
+                    continue
+
+                # Ингрессия: пересечение ближайшей границы знака
+                s0, s1 = int(p0 // 30.0), int(p1 // 30.0)
+                if s0 != s1:
+                    # при движении вперёд граница — начало нового знака, назад — начало старого
+                    boundary = 30.0 * (s1 if _angdiff(p1, p0) > 0 else s0)
+                    fb = lambda jd, f=f, b=boundary: _angdiff(f(jd), b)
+                    t = _refine(fb, prev_jd, jd_prog, _angdiff(p0, boundary))
+                    events.append({
+                        "type": "ingress",
+                        "point": name,
+                        "sign": SIGNS[s1 % 12],
+                        "retrograde": _angdiff(p1, p0) < 0,
+                        **event_base(t),
+                    })
+
+                if not aspects:
+                    continue
+                for natal_name in names:
+                    n_lon = natal[natal_name]
+                    for asp_name, asp in ASPECTS:
+                        for target in ((asp,) if asp in (0.0, 180.0) else (asp, -asp)):
+                            d0 = _angdiff(_angdiff(p0, n_lon), target)
+                            d1 = _angdiff(_angdiff(p1, n_lon), target)
+                            if not _crossed(d0, d1):
+                                continue
+                            fa = lambda jd, f=f, n=n_lon, tg=target: _angdiff(_angdiff(f(jd), n), tg)
+                            t = _refine(fa, prev_jd, jd_prog, d0)
+                            events.append({
+                                "type": "aspect",
+                                "point": name,
+                                "natal": natal_name,
+                                "aspect": asp_name,
+                                "angle": asp,
+                                **event_base(t),
+                            })
+
+        prev_jd, prev = jd_prog, cur
+
+    events.sort(key=lambda e: e["jd_prog"])
+    return {
+        "method": "secondary (1 day = 1 tropical year)",
+        "angles": "Naibod ARMC at birth place",
+        "step": step,
+        "natal": {k: {"lon": v, "sign": SIGNS[int(v // 30.0) % 12]} for k, v in natal.items()},
+        "timeline": timeline,
+        "events": events,
+        # шаги, где ASC/MC прыгнул (полярные широты): события на них не ищутся
+        "discontinuities": discontinuities,
+    }
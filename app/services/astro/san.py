@@ -6,6 +6,8 @@ import swisseph as swe
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from .cache import SKY_CACHE, jd_key, cached
+
 def _norm360(x: float) -> float:
     x %= 360.0
     return x + 360.0 if x < 0 else x
@@ -146,7 +148,13 @@ def calc_prenatal_lunations(
     Возвращает SAN1 и SAN2 с типом, временем, JD и долготами светил.
     """
     jd_birth = _to_jd_utc(date, time, tz)
+    # Место (lat/lon) на SAN не влияет — кэшируем только по моменту
+    return cached(
+        SKY_CACHE, ("san", jd_key(jd_birth), natal_sun_lon, natal_moon_lon),
+        lambda: _calc_san(jd_birth, natal_sun_lon, natal_moon_lon),
+    )
 
+def _calc_san(jd_birth: float, natal_sun_lon: float | None, natal_moon_lon: float | None) -> Dict[str, Any]:
     # Если долгот Солнца/Луны в натале не передали — посчитаем на лету (по UT)
     if natal_sun_lon is None or natal_moon_lon is None:
         mx, _ = swe.calc_ut(jd_birth, swe.MOON, swe.FLG_SWIEPH)
@@ -0,0 +1,106 @@
+# app/services/profiling.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import cProfile
+import marshal
+import os
+import pstats
+import time
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from app.services.astro.cache import bypass_cache
+
+ADMIN_KEY = os.getenv("ADMIN_KEY")  # None -> профилирование недоступно
+
+PROFILE_FORMATS = {"json", "pstats"}
+
+# Так cProfile подписывает C-функции pyswisseph: "<built-in method swisseph.calc_ut>"
+_SWE_PREFIX = "<built-in method swisseph."
+
+
+def check_admin_key(provided: Optional[str]) -> None:
+    if not ADMIN_KEY or provided != ADMIN_KEY:
+        raise HTTPException(403, detail="Forbidden: profiling requires a valid admin key")
+
+
+def _func_label(func: Tuple[str, int, str]) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def summarize_profile(prof: cProfile.Profile, wall_ms: float, top: int = 25) -> Dict[str, Any]:
+    """
+    Сводка профиля: топ функций по cumulative time и счётчики вызовов Swiss Ephemeris.
+    """
+    stats = pstats.Stats(prof).stats  # {func: (cc, nc, tt, ct, callers)}
+
+    rows: List[Dict[str, Any]] = []
+    swe_calls: Dict[str, Dict[str, Any]] = {}
+    for func, (cc, nc, tt, ct, _callers) in stats.items():
+        label = _func_label(func)
+        rows.append({
+            "function": label,
+            "calls": nc,
+            "primitive_calls": cc,
+            "tottime_ms": round(tt * 1000.0, 3),
+            "cumtime_ms": round(ct * 1000.0, 3),
+        })
+        if label.startswith(_SWE_PREFIX):
+            swe_name = label[len(_SWE_PREFIX):].rstrip(">")
+            swe_calls[swe_name] = {"calls": nc, "time_ms": round(tt * 1000.0, 3)}
+
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return {
+        "wall_ms": round(wall_ms, 3),
+        "total_calls": sum(r["calls"] for r in rows),
+        "swe_total_calls": sum(v["calls"] for v in swe_calls.values()),
+        "swe_calls": dict(sorted(swe_calls.items(), key=lambda kv: kv[1]["calls"], reverse=True)),
+        "top": rows[:top],
+    }
+
+
+def run_profiled(
+    fn: Callable[..., Any],
+    *args: Any,
+    admin_key: Optional[str],
+    fmt: str = "json",
+    top: int = 25,
+    **kwargs: Any,
+) -> Any:
+    """
+    Выполняет fn(*args, **kwargs) под cProfile.
+      fmt="json"   -> результат + ключ "profile" со сводкой
+      fmt="pstats" -> файл профиля (marshal pstats) для snakeviz/pstats
+    Вызывается только при явном запросе профиля — обычные запросы сюда не попадают.
+    Кэши расчётов на время профиля обходятся (без очистки): иначе повторный
+    медленный запрос показал бы только попадания в кэш.
+    """
+    check_admin_key(admin_key)
+    if fmt not in PROFILE_FORMATS:
+        raise HTTPException(400, detail=f"Unknown profile format: {fmt}. Use json | pstats")
+
+    prof = cProfile.Profile()
+    with bypass_cache() as bypassed:
+        t0 = time.perf_counter()
+        prof.enable()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            prof.disable()
+    wall_ms = (time.perf_counter() - t0) * 1000.0
+
+    if fmt == "pstats":
+        return Response(
+            content=marshal.dumps(pstats.Stats(prof).stats),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="profile.pstats"'},
+        )
+
+    summary = summarize_profile(prof, wall_ms, top=top)
+    summary["cache"] = {"bypassed": bypassed}
+    if isinstance(result, dict):
+        return {**result, "profile": summary}
+    return {"result": result, "profile": summary}
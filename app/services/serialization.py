@@ -0,0 +1,160 @@
+# app/services/serialization.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import json
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+
+_MEDIA_ALIASES = {
+    "application/json": JSON,
+    "*/*": JSON,
+    "application/*": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/vnd.apache.arrow.stream": ARROW_STREAM,
+    "application/vnd.apache.arrow.file": ARROW_FILE,
+}
+
+# Как разложить ответ эндпоинта в одну Arrow-таблицу:
+# (строки [{...}] или колонки {name: [...]}, всё остальное -> метаданные схемы)
+TableFn = Callable[[Dict[str, Any]], Tuple[Union[List[Dict[str, Any]], Dict[str, List[Any]]], Dict[str, Any]]]
+
+_HEADERS = {"Vary": "Accept"}
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Выбор формата по Accept (с учётом q). Без заголовка — JSON."""
+    if not accept:
+        return JSON
+    candidates = []
+    for i, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0 and media.lower() in _MEDIA_ALIASES:
+            candidates.append((-q, i, _MEDIA_ALIASES[media.lower()]))
+    # Незнакомые типы (text/html и т.п.) — отдаём JSON, как до появления бинарных форматов
+    return min(candidates)[2] if candidates else JSON
+
+
+def round_floats(obj: Any, precision: int) -> Any:
+    """Рекурсивно округляет float до precision знаков."""
+    if isinstance(obj, float):
+        return round(obj, precision)
+    if isinstance(obj, dict):
+        return {k: round_floats(v, precision) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [round_floats(v, precision) for v in obj]
+    return obj
+
+
+def flatten(d: Dict[str, Any], prefix: str = "", sep: str = ".") -> Dict[str, Any]:
+    """{"Sun": {"lon": 1}} -> {"Sun.lon": 1}"""
+    out: Dict[str, Any] = {}
+    for k, v in d.items():
+        key = f"{prefix}{sep}{k}" if prefix else str(k)
+        if isinstance(v, dict):
+            out.update(flatten(v, key, sep))
+        else:
+            out[key] = v
+    return out
+
+
+def to_columnar(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Список записей -> колонки: [{"a": 1, "b": {"c": 2}}, ...] -> {"a": [1, ...], "b": {"c": [2, ...]}}.
+    Отсутствующие в записи ключи — None.
+    """
+    records = list(records)
+    flat = [flatten(r, sep="\0") for r in records]
+    keys: Dict[str, None] = {}
+    for r in flat:
+        keys.update(dict.fromkeys(r))
+    out: Dict[str, Any] = {}
+    for key in keys:
+        node = out
+        *parents, leaf = key.split("\0")
+        for p in parents:
+            node = node.setdefault(p, {})
+        node[leaf] = [r.get(key) for r in flat]
+    return out
+
+
+def _rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Строки -> колонки по объединению ключей; отсутствующие значения — None."""
+    keys: Dict[str, None] = {}
+    for r in rows:
+        keys.update(dict.fromkeys(r))
+    return {k: [r.get(k) for r in rows] for k in keys}
+
+
+def _msgpack(payload: Dict[str, Any], columnar: Iterable[str]) -> bytes:
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(406, detail="MessagePack is not available on this server (pip install msgpack)")
+    data = dict(payload)
+    for key in columnar:
+        if isinstance(data.get(key), list):
+            data[key] = to_columnar(data[key])
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def _arrow(payload: Dict[str, Any], table: TableFn, file_format: bool) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(406, detail="Arrow is not available on this server (pip install pyarrow)")
+    rows, meta = table(payload)
+    # from_pylist берёт схему по ключам первой строки и молча теряет остальные —
+    # собираем колонки по объединению ключей всех строк
+    tbl = pa.Table.from_pydict(rows if isinstance(rows, dict) else _rows_to_columns(rows))
+    tbl = tbl.replace_schema_metadata({"meta": json.dumps(meta, separators=(",", ":"))})
+    sink = pa.BufferOutputStream()
+    writer_cls = pa.ipc.new_file if file_format else pa.ipc.new_stream
+    with writer_cls(sink, tbl.schema) as writer:
+        writer.write_table(tbl)
+    return sink.getvalue().to_pybytes()
+
+
+def render(
+    payload: Any,
+    *,
+    accept: Optional[str],
+    precision: Optional[int] = None,
+    columnar: Iterable[str] = (),
+    table: Optional[TableFn] = None,
+) -> Any:
+    """
+    Ответ эндпоинта в формате по Accept:
+      application/json                      — как раньше (компактный JSON)
+      application/msgpack                   — то же, списки из columnar — по колонкам
+      application/vnd.apache.arrow.stream   — Arrow IPC (stream), строки из table(),
+      application/vnd.apache.arrow.file       остальное — JSON в метаданных схемы ("meta").
+                                              Одна таблица на ответ: какую — решает table().
+    precision — округление float до N знаков (для всех форматов).
+    """
+    if isinstance(payload, Response):
+        return payload  # например, файл профиля
+    media = negotiate(accept)
+    if precision is not None:
+        payload = round_floats(payload, precision)
+
+    if media == MSGPACK:
+        return Response(content=_msgpack(payload, columnar), media_type=MSGPACK, headers=_HEADERS)
+    if media in (ARROW_STREAM, ARROW_FILE):
+        if table is None:
+            raise HTTPException(406, detail="Arrow format is not supported for this endpoint")
+        return Response(content=_arrow(payload, table, media == ARROW_FILE), media_type=media, headers=_HEADERS)
+    return JSONResponse(payload, headers=_HEADERS)
@@ -0,0 +1,124 @@
+# app/services/sky_stream.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
+import itertools
+import json
+import os
+import swisseph as swe
+
+from app.services.astro.planets import calc_planets
+from app.services.astro.moon import calc_moon
+from app.services.astro.nodes import calc_nodes
+from app.services.astro.houses import calc_houses
+
+SKY_TICK_SEC = float(os.getenv("SKY_TICK_SEC", "5"))
+
+# (lat, lon, houseSystem); координаты округляем, чтобы близкие подписчики делили расчёт
+Location = Tuple[float, float, str]
+
+
+def location_key(lat: float, lon: float, system: str) -> Location:
+    return round(float(lat), 4), round(float(lon), 4), system
+
+
+def _jd_now() -> Tuple[float, str]:
+    now = datetime.now(timezone.utc)
+    ut = now.hour + now.minute / 60 + (now.second + now.microsecond / 1e6) / 3600
+    return swe.julday(now.year, now.month, now.day, ut), now.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def compute_frames(tick: int, locations: List[Location]) -> Tuple[str, Dict[Location, str]]:
+    """
+    Один расчёт неба на тик + дома для каждой уникальной локации.
+    Возвращает уже сериализованные JSON-строки: общий кадр и кадры по локациям.
+    """
+    jd_ut, iso = _jd_now()
+    bodies: Dict[str, Any] = {}
+    bodies.update(calc_planets(jd_ut, detail=True))
+    bodies["Moon"] = calc_moon(jd_ut, detail=True)
+    bodies["LunarNode"] = calc_nodes(jd_ut, "true")
+    sky = {"tick": tick, "datetime": iso, "jd_ut": jd_ut, "bodies": bodies}
+
+    per_location: Dict[Location, str] = {}
+    for loc in locations:
+        lat, lon, system = loc
+        try:
+            houses, angles = calc_houses(jd_ut, lat, lon, system)
+            local = {"houses": houses, "angles": angles}
+        except Exception as e:
+            local = {"houses_error": f"houses calc failed: {e}"}
+        per_location[loc] = json.dumps({**sky, "location": {"lat": lat, "lon": lon, "houseSystem": system}, **local})
+    return json.dumps(sky), per_location
+
+
+class Subscriber:
+    """Подписчик держит только последний кадр — медленный клиент пропускает устаревшие."""
+
+    def __init__(self, sub_id: int, location: Optional[Location]):
+        self.id = sub_id
+        self.location = location
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=1)
+
+    def offer(self, frame: str) -> None:
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(frame)
+
+
+class SkyBroadcaster:
+    """
+    Считает небо один раз за тик и рассылает всем подписчикам.
+    Стоимость растёт с числом тиков (и уникальных локаций), а не с числом подписчиков.
+    Фоновая задача живёт, пока есть хотя бы один подписчик.
+    """
+
+    def __init__(self, tick_sec: float = SKY_TICK_SEC):
+        self.tick_sec = tick_sec
+        self.ticks = 0
+        self._subs: Dict[int, Subscriber] = {}
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+        self._last_shared: Optional[str] = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self, location: Optional[Location] = None) -> Subscriber:
+        sub = Subscriber(next(self._ids), location)
+        self._subs[sub.id] = sub
+        # Новый подписчик без локации сразу получает последний кадр
+        if location is None and self._last_shared is not None:
+            sub.offer(self._last_shared)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subs.pop(sub.id, None)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._subs:
+            started = loop.time()
+            locations = sorted({s.location for s in self._subs.values() if s.location is not None})
+            self.ticks += 1
+            try:
+                shared, per_location = await asyncio.to_thread(compute_frames, self.ticks, locations)
+            except Exception as e:
+                shared, per_location = json.dumps({"tick": self.ticks, "error": f"sky calc failed: {e}"}), {}
+            self._last_shared = shared
+
+            for sub in list(self._subs.values()):
+                sub.offer(per_location.get(sub.location, shared) if sub.location is not None else shared)
+
+            await asyncio.sleep(max(0.0, self.tick_sec - (loop.time() - started)))
+        self._last_shared = None
+
+
+broadcaster = SkyBroadcaster()
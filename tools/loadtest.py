@@ -0,0 +1,437 @@
+# tools/loadtest.py
+"""
+Нагрузочный тест /natal/chart через HTTP.
+
+Поднимает приложение под uvicorn с заданным числом воркеров, гоняет
+детерминированную (seed) смесь запросов на фиксированных уровнях
+конкурентности и пишет JSON-отчёт: throughput, p50/p95/p99, доля ошибок.
+
+Примеры:
+    python tools/loadtest.py run --workers 1,2,4 --concurrency 1,4,16,64 \\
+        --duration 20 --seed 42 --out before.json
+    python tools/loadtest.py run --url http://127.0.0.1:8000 --concurrency 8
+    python tools/loadtest.py compare before.json after.json
+
+Только стандартная библиотека — ставить ничего дополнительно не нужно.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOUSE_SYSTEMS = ["Placidus", "Equal", "WholeSign", "Porphyry", "Alcabitius"]
+STARS = ["Regulus", "Spica", "Aldebaran", "Antares", "Sirius", "Algol", "Fomalhaut"]
+TIMEZONES = ["UTC", "Europe/Tallinn", "Europe/Moscow", "America/New_York", "Asia/Tokyo"]
+
+# (имя, вес) — доля типа запроса в смеси
+MIX: List[Tuple[str, float]] = [
+    ("placidus", 0.40),
+    ("other_houses", 0.20),
+    ("with_stars", 0.25),
+    ("lite", 0.15),  # detail=false, mean node
+]
+
+# При насыщении прирост throughput на следующем уровне меньше этого порога
+SATURATION_GAIN = 0.10
+
+
+def _random_moment(rng: random.Random) -> Dict[str, Any]:
+    year = rng.randint(1900, 2030)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
+    return {
+        "date": f"{year:04d}-{month:02d}-{day:02d}",
+        "time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+        "lat": round(rng.uniform(-60.0, 65.0), 4),
+        "lon": round(rng.uniform(-180.0, 180.0), 4),
+        "tz": rng.choice(TIMEZONES),
+    }
+
+
+def build_request_pool(seed: int, size: int) -> List[Tuple[str, str]]:
+    """Список (тип, path?query) — одинаковый для одинаковых seed/size."""
+    rng = random.Random(seed)
+    kinds = [k for k, _ in MIX]
+    weights = [w for _, w in MIX]
+    pool: List[Tuple[str, str]] = []
+    for _ in range(size):
+        kind = rng.choices(kinds, weights)[0]
+        params: List[Tuple[str, Any]] = list(_random_moment(rng).items())
+        if kind == "placidus":
+            params.append(("houseSystem", "Placidus"))
+        elif kind == "other_houses":
+            params.append(("houseSystem", rng.choice(HOUSE_SYSTEMS[1:])))
+        elif kind == "with_stars":
+            params.append(("houseSystem", rng.choice(HOUSE_SYSTEMS)))
+            for star in rng.sample(STARS, rng.randint(1, 4)):
+                params.append(("stars", star))
+        elif kind == "lite":
+            params += [("houseSystem", "Placidus"), ("detail", "false"), ("nodes", "mean")]
+        pool.append((kind, "/natal/chart?" + urlencode(params)))
+    return pool
+
+
+def percentile(sorted_vals: List[float], q: float) -> Optional[float]:
+    """Перцентиль по nearest-rank; sorted_vals должен быть отсортирован."""
+    if not sorted_vals:
+        return None
+    rank = max(1, int(-(-q * len(sorted_vals) // 100)))  # ceil
+    return sorted_vals[min(rank, len(sorted_vals)) - 1]
+
+
+def _latency_stats(lat_ms: List[float]) -> Dict[str, Optional[float]]:
+    vals = sorted(lat_ms)
+
+    def r(x: Optional[float]) -> Optional[float]:
+        return None if x is None else round(x, 3)
+
+    return {
+        "p50": r(percentile(vals, 50)),
+        "p95": r(percentile(vals, 95)),
+        "p99": r(percentile(vals, 99)),
+        "mean": r(sum(vals) / len(vals)) if vals else None,
+        "max": r(vals[-1]) if vals else None,
+    }
+
+
+class _Feeder:
+    """Раздаёт запросы из пула по кругу, пока не кончится лимит или время."""
+
+    def __init__(self, pool: List[Tuple[str, str]], offset: int,
+                 max_requests: Optional[int], deadline: Optional[float]):
+        self._pool = pool
+        self._offset = offset
+        self._i = 0
+        self._max = max_requests
+        self._deadline = deadline
+        self._lock = threading.Lock()
+
+    def next(self) -> Optional[Tuple[str, str]]:
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return None
+        with self._lock:
+            if self._max is not None and self._i >= self._max:
+                return None
+            item = self._pool[(self._offset + self._i) % len(self._pool)]
+            self._i += 1
+            return item
+
+    @property
+    def end_offset(self) -> int:
+        return (self._offset + self._i) % len(self._pool)
+
+
+def _worker(host: str, port: int, headers: Dict[str, str], feeder: _Feeder,
+            samples: List[Tuple[str, float, int]], timeout: float) -> None:
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    local: List[Tuple[str, float, int]] = []
+    while True:
+        item = feeder.next()
+        if item is None:
+            break
+        kind, path = item
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            status = resp.status
+        except Exception:
+            status = 0  # сетевая ошибка / таймаут
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        local.append((kind, (time.perf_counter() - t0) * 1000.0, status))
+    conn.close()
+    samples.extend(local)
+
+
+def run_level(host: str, port: int, headers: Dict[str, str], pool: List[Tuple[str, str]],
+              offset: int, concurrency: int, requests: Optional[int], duration: Optional[float],
+              timeout: float) -> Tuple[Dict[str, Any], int]:
+    """
+    Один уровень нагрузки. Запросы берутся из пула начиная с offset, чтобы
+    следующие уровни не повторяли уже закэшированные сервером моменты.
+    Возвращает (статистика уровня, offset для следующего уровня).
+    """
+    deadline = time.perf_counter() + duration if duration else None
+    feeder = _Feeder(pool, offset, requests, deadline)
+    samples: List[Tuple[str, float, int]] = []
+    threads = [
+        threading.Thread(target=_worker, args=(host, port, headers, feeder, samples, timeout), daemon=True)
+        for _ in range(concurrency)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    total = len(samples)
+    errors = sum(1 for _, _, st in samples if st != 200)
+    by_kind: Dict[str, Dict[str, Any]] = {}
+    for kind, _ in MIX:
+        lat = [ms for k, ms, _ in samples if k == kind]
+        if lat:
+            by_kind[kind] = {"requests": len(lat), "latency_ms": _latency_stats(lat)}
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 6) if total else None,
+        "status_counts": _status_counts(samples),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 3) if elapsed > 0 else None,
+        "latency_ms": _latency_stats([ms for _, ms, _ in samples]),
+        "by_kind": by_kind,
+    }, feeder.end_offset
+
+
+def _status_counts(samples: List[Tuple[str, float, int]]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for _, _, st in samples:
+        out[str(st)] = out.get(str(st), 0) + 1
+    return out
+
+
+def saturation(levels: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Точка насыщения: первый уровень, после которого рост конкурентности
+    даёт прирост throughput меньше SATURATION_GAIN.
+    """
+    peak = max(levels, key=lambda lv: lv["throughput_rps"] or 0.0, default=None)
+    sat = None
+    for prev, cur in zip(levels, levels[1:]):
+        p, c = prev["throughput_rps"] or 0.0, cur["throughput_rps"] or 0.0
+        if p > 0 and (c - p) / p < SATURATION_GAIN:
+            sat = prev
+            break
+    return {
+        "saturation_concurrency": sat["concurrency"] if sat else None,
+        "peak_throughput_rps": peak["throughput_rps"] if peak else None,
+        "peak_concurrency": peak["concurrency"] if peak else None,
+    }
+
+
+def _wait_ready(host: str, port: int, timeout: float, proc: Optional[subprocess.Popen]) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1.0)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {host}:{port} did not become ready in {timeout}s")
+
+
+def start_server(host: str, port: int, workers: int, env: Dict[str, str]) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", host, "--port", str(port),
+        "--workers", str(workers),
+        "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(cmd, cwd=REPO_ROOT, env=env)
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _int_list(s: str) -> List[int]:
+    return [int(x) for x in s.split(",") if x.strip()]
+
+
+def cmd_run(args: argparse.Namespace) -> Dict[str, Any]:
+    pool = build_request_pool(args.seed, args.pool)
+    headers = {"Connection": "keep-alive"}
+    if args.api_key:
+        headers["x-api-key"] = args.api_key
+
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname or "127.0.0.1", parts.port or 80
+        worker_counts: List[Optional[int]] = [None]  # внешний сервер — воркеры не знаем
+    else:
+        host, port = args.host, args.port
+        worker_counts = list(_int_list(args.workers))
+
+    env = dict(os.environ)
+    if args.api_key:
+        env["API_KEY"] = args.api_key
+
+    runs: List[Dict[str, Any]] = []
+    for workers in worker_counts:
+        proc = start_server(host, port, workers, env) if workers is not None else None
+        try:
+            _wait_ready(host, port, args.startup_timeout, proc)
+            # каждая конфигурация воркеров видит одну и ту же последовательность запросов
+            offset = 0
+            if args.warmup:
+                _, offset = run_level(host, port, headers, pool, offset, max(_int_list(args.concurrency)),
+                                      args.warmup, None, args.timeout)
+            levels = []
+            for c in _int_list(args.concurrency):
+                lv, offset = run_level(host, port, headers, pool, offset, c,
+                                       args.requests, args.duration, args.timeout)
+                levels.append(lv)
+                lat = lv["latency_ms"]
+                print(f"workers={workers} c={c:<4d} rps={lv['throughput_rps']} "
+                      f"p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} "
+                      f"err={lv['error_rate']}", file=sys.stderr)
+        finally:
+            if proc is not None:
+                stop_server(proc)
+        runs.append({"workers": workers, "levels": levels, **saturation(levels)})
+
+    return {
+        "meta": {
+            "tool": "tools/loadtest.py",
+            "git_rev": _git_rev(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "pool": args.pool,
+            "mix": dict(MIX),
+            "requests_per_level": args.requests,
+            "duration_s": args.duration,
+            "warmup": args.warmup,
+            "target": args.url or f"http://{host}:{port}",
+        },
+        "runs": runs,
+    }
+
+
+def _pct(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    if not a or b is None:
+        return None
+    return round((b - a) / a * 100.0, 2)
+
+
+def cmd_compare(args: argparse.Namespace) -> Dict[str, Any]:
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    def index(rep: Dict[str, Any]) -> Dict[Tuple[Any, int], Dict[str, Any]]:
+        return {(r["workers"], lv["concurrency"]): lv for r in rep["runs"] for lv in r["levels"]}
+
+    bi, ni = index(base), index(new)
+    rows = []
+    for key in sorted(set(bi) & set(ni), key=lambda k: (k[0] or 0, k[1])):
+        b, n = bi[key], ni[key]
+        rows.append({
+            "workers": key[0],
+            "concurrency": key[1],
+            "throughput_rps": [b["throughput_rps"], n["throughput_rps"]],
+            "throughput_change_pct": _pct(b["throughput_rps"], n["throughput_rps"]),
+            "p50_ms": [b["latency_ms"]["p50"], n["latency_ms"]["p50"]],
+            "p99_ms": [b["latency_ms"]["p99"], n["latency_ms"]["p99"]],
+            "p99_change_pct": _pct(b["latency_ms"]["p99"], n["latency_ms"]["p99"]),
+            "error_rate": [b["error_rate"], n["error_rate"]],
+        })
+        print(f"workers={key[0]} c={key[1]:<4d} "
+              f"rps {b['throughput_rps']} -> {n['throughput_rps']} ({rows[-1]['throughput_change_pct']}%)  "
+              f"p99 {b['latency_ms']['p99']} -> {n['latency_ms']['p99']} ({rows[-1]['p99_change_pct']}%)",
+              file=sys.stderr)
+
+    saturation_rows = []
+    new_runs = {r["workers"]: r for r in new["runs"]}
+    for r in base["runs"]:
+        other = new_runs.get(r["workers"])
+        if other is None:
+            continue
+        saturation_rows.append({
+            "workers": r["workers"],
+            "saturation_concurrency": [r["saturation_concurrency"], other["saturation_concurrency"]],
+            "peak_throughput_rps": [r["peak_throughput_rps"], other["peak_throughput_rps"]],
+            "peak_throughput_change_pct": _pct(r["peak_throughput_rps"], other["peak_throughput_rps"]),
+        })
+
+    return {
+        "base": {"file": args.base, **{k: base["meta"].get(k) for k in ("git_rev", "seed", "pool")}},
+        "new": {"file": args.new, **{k: new["meta"].get(k) for k in ("git_rev", "seed", "pool")}},
+        "levels": rows,
+        "saturation": saturation_rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="HTTP load test for /natal/chart")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="start the app and run load levels")
+    r.add_argument("--workers", default="1", help="comma-separated uvicorn worker counts, e.g. 1,2,4")
+    r.add_argument("--concurrency", default="1,4,16,64", help="comma-separated concurrency levels")
+    r.add_argument("--duration", type=float, default=None, help="seconds per level")
+    r.add_argument("--requests", type=int, default=None, help="requests per level (default 500 if no --duration)")
+    r.add_argument("--warmup", type=int, default=50, help="warm-up requests per worker config (not reported)")
+    r.add_argument("--seed", type=int, default=42)
+    r.add_argument("--pool", type=int, default=10000,
+                   help="distinct requests in the mix; smaller pool -> more cache hits")
+    r.add_argument("--host", default="127.0.0.1")
+    r.add_argument("--port", type=int, default=8765)
+    r.add_argument("--url", default=None, help="target an already running server instead of starting uvicorn")
+    r.add_argument("--api-key", default=os.getenv("API_KEY"))
+    r.add_argument("--timeout", type=float, default=30.0, help="per-request timeout, s")
+    r.add_argument("--startup-timeout", type=float, default=30.0)
+    r.add_argument("--out", default=None, help="write JSON report here (default: stdout)")
+
+    c = sub.add_parser("compare", help="compare two reports")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--out", default=None)
+
+    args = ap.parse_args(argv)
+    if args.cmd == "run":
+        if args.duration is None and args.requests is None:
+            args.requests = 500
+        report = cmd_run(args)
+    else:
+        report = cmd_compare(args)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())